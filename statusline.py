@@ -1,9 +1,17 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-import json, sys, os, subprocess, io
-from datetime import datetime, timedelta
+import json, sys, os, subprocess, io, struct, zlib, mmap
+from array import array
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
 # Configuration: Toggle between time calculation methods
 # Set to True to use fixed cycle times (6h, 11h, 16h, 21h)
 # Set to False to use original 5-hour block calculation
@@ -13,10 +21,38 @@ USE_FIXED_CYCLES = True
 # Adjust this based on your plan
 COST_LIMIT_PER_SESSION = 5.0  # $5 per 5 hours for Claude Pro
 
-# Fix encoding on Windows
-if sys.platform == "win32":
-    sys.stdin = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8')
-    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+# Configuration: Persist transcript scan state between refreshes
+# Set to True to only parse transcript lines appended since the last refresh
+# Set to False to re-read the whole transcript on every refresh
+USE_STATE_CACHE = True
+STATE_FILE = os.path.join(os.path.expanduser("~"), ".claude", "statusline-state.bin")
+
+# Configuration: Time zone for reset hours, displayed times and naive timestamps
+# Set to a tzinfo such as zoneinfo.ZoneInfo("Asia/Ho_Chi_Minh") to pin it
+# Set to None to use the system local time zone
+LOCAL_TZ = None
+
+def system_clock():
+    """Current time as an aware UTC datetime"""
+    return datetime.now(timezone.utc)
+
+# Clock used by every time calculation; tests replace it to simulate time
+CLOCK = system_clock
+
+def current_time():
+    """Current time from CLOCK"""
+    return CLOCK()
+
+def local_zone(tz=None):
+    """Time zone for wall clock values: tz, else LOCAL_TZ (None = system local)"""
+    return tz if tz is not None else LOCAL_TZ
+
+def localize(dt, tz=None):
+    """Aware datetime for dt, reading a naive dt as wall clock time in local_zone(tz)"""
+    if dt.tzinfo is not None:
+        return dt
+    tz = local_zone(tz)
+    return dt.astimezone() if tz is None else dt.replace(tzinfo=tz)
 
 # Beautiful color palette (RGB)
 class Colors:
@@ -40,13 +76,253 @@ class Colors:
     DIM = "\033[2m"
     RESET = "\033[0m"
 
+# Persisted scan state
+#
+# Each refresh runs in a fresh process, so anything learned from the transcript
+# is kept in a small binary file instead of being re-parsed from scratch.
+# Layout (little-endian):
+#   header:  magic, schema version, record count, crc32 of the header
+#   index:   (key hash, updated, offset, length, crc32) per record, sorted by key hash
+#   records: crc32, fixed fields, utf-8 key, block starts (array of doubles)
+# Lookups binary-search the memory-mapped index and only validate the index
+# entries and the record they touch, so a refresh that finds its state unchanged
+# does O(log n) work. Saving rewrites every record, which is bounded by
+# STATE_MAX_RECORDS. Only modules that are cheap to import are used here, as the
+# status line starts a new process for every refresh. A bad checksum or a different schema version simply
+# invalidates the affected state.
+STATE_MAGIC = b"CCSL"
+STATE_VERSION = 3
+STATE_MAX_RECORDS = 256
+STATE_HEAD_BYTES = 1024
+BLOCK_SECONDS = 5 * 60 * 60
+
+_STATE_HEADER = struct.Struct("<4sHHII")     # magic, version, reserved, count, header crc
+_STATE_INDEX = struct.Struct("<QdIII")       # key hash, updated, offset, length, entry crc
+_STATE_RECORD = struct.Struct("<IQIqddHI")   # crc, offset, head crc, context length,
+                                             # context ts, block ts, key length, block count
+
+TranscriptState = namedtuple("TranscriptState", [
+    "offset",          # bytes of the transcript already parsed
+    "head_crc",        # crc32 of the first bytes, to detect rewritten transcripts
+    "context_length",  # context length of the most recent main chain entry
+    "context_ts",      # epoch of that entry
+    "block_ts",        # epoch of the latest entry counted towards blocks
+    "blocks",          # 5-hour block start epochs, ascending
+])
+
+EMPTY_TRANSCRIPT_STATE = TranscriptState(0, 0, 0, float("-inf"), float("-inf"), ())
+
+def _state_key_hash(key):
+    """Stable 64-bit hash of a state key (records also store the full key)"""
+    key_bytes = key.encode("utf-8")
+    return (zlib.crc32(key_bytes) << 32) | zlib.adler32(key_bytes)
+
+def _pack_state(key, state):
+    """Serialize a TranscriptState record"""
+    key_bytes = key.encode("utf-8")
+    blocks = array("d", state.blocks)
+    if sys.byteorder != "little":
+        blocks.byteswap()
+    body = _STATE_RECORD.pack(
+        0, state.offset, state.head_crc, state.context_length,
+        state.context_ts, state.block_ts, len(key_bytes), len(blocks)
+    )[4:] + key_bytes + blocks.tobytes()
+    return struct.pack("<I", zlib.crc32(body)) + body
+
+def _unpack_state(raw, key):
+    """Deserialize a TranscriptState record, or None if it is corrupt or for another key"""
+    if len(raw) < _STATE_RECORD.size:
+        return None
+    (crc, offset, head_crc, context_length, context_ts, block_ts,
+     key_length, block_count) = _STATE_RECORD.unpack_from(raw, 0)
+    key_end = _STATE_RECORD.size + key_length
+    if len(raw) != key_end + block_count * 8 or zlib.crc32(raw[4:]) != crc:
+        return None
+    if raw[_STATE_RECORD.size:key_end] != key.encode("utf-8"):
+        return None
+    blocks = array("d")
+    blocks.frombytes(raw[key_end:])
+    if sys.byteorder != "little":
+        blocks.byteswap()
+    return TranscriptState(offset, head_crc, context_length, context_ts, block_ts, tuple(blocks))
+
+class _StateLock:
+    """Advisory lock on a sidecar file, held while the state file is rewritten"""
+
+    def __init__(self, path):
+        self.path = path + ".lock"
+        self._file = None
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._file = open(self.path, "a+b")
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+        except OSError:
+            # Locking is best effort; an unlocked save can only lose a cache entry
+            pass
+        return self
+
+    def __exit__(self, *exc_info):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        except OSError:
+            pass
+        self._file.close()
+
+class StateStore:
+    """Versioned binary store of per-transcript scan state"""
+
+    def __init__(self, path):
+        self.path = path
+        self._map = None
+        self._count = 0
+        self._pending = {}
+
+    def load(self):
+        """Memory-map the state file, discarding it if invalid"""
+        try:
+            with open(self.path, "rb") as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return self
+        try:
+            magic, version, _, count, header_crc = _STATE_HEADER.unpack_from(self._map, 0)
+            index_end = _STATE_HEADER.size + count * _STATE_INDEX.size
+            if (magic != STATE_MAGIC or version != STATE_VERSION or index_end > len(self._map)
+                    or zlib.crc32(self._map[:_STATE_HEADER.size - 4]) != header_crc):
+                self.close()
+            else:
+                self._count = count
+        except struct.error:
+            self.close()
+        return self
+
+    def close(self):
+        """Release the memory map"""
+        if self._map is not None:
+            self._map.close()
+        self._map = None
+        self._count = 0
+
+    def _entry(self, i):
+        """Index entry i as (key hash, updated, offset, length), or None if corrupt"""
+        start = _STATE_HEADER.size + i * _STATE_INDEX.size
+        key_hash, updated, offset, length, crc = _STATE_INDEX.unpack_from(self._map, start)
+        if zlib.crc32(self._map[start:start + _STATE_INDEX.size - 4]) != crc:
+            return None
+        if offset + length > len(self._map):
+            return None
+        return key_hash, updated, offset, length
+
+    def get(self, key):
+        """Return the stored TranscriptState for key, or None"""
+        if key in self._pending:
+            return self._pending[key]
+        key_hash = _state_key_hash(key)
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            entry = self._entry(mid)
+            if entry is None:
+                return None
+            if entry[0] < key_hash:
+                lo = mid + 1
+            else:
+                hi = mid
+        entry = self._entry(lo) if lo < self._count else None
+        if entry is None or entry[0] != key_hash:
+            return None
+        _, _, offset, length = entry
+        return _unpack_state(self._map[offset:offset + length], key)
+
+    def put(self, key, state):
+        """Stage state for key; written by save()"""
+        self._pending[key] = state
+
+    def _records(self):
+        """Raw records of the mapped file, keyed by key hash"""
+        records = {}
+        for i in range(self._count):
+            entry = self._entry(i)
+            if entry is not None:
+                key_hash, updated, offset, length = entry
+                records[key_hash] = (updated, self._map[offset:offset + length])
+        return records
+
+    def save(self):
+        """Atomically rewrite the state file with staged records merged in"""
+        self.close()
+        with _StateLock(self.path):
+            # Merge into the file as it is now, not as it was at load(), so
+            # records saved meanwhile by other sessions are kept
+            current = StateStore(self.path).load()
+            records = current._records()
+            current.close()
+            self._write(records)
+
+    def _write(self, records):
+        """Write records plus staged state to a temp file and swap it in"""
+        now = current_time().timestamp()
+        for key, state in self._pending.items():
+            records[_state_key_hash(key)] = (now, _pack_state(key, state))
+        self._pending = {}
+
+        # Keep only the most recently updated sessions
+        if len(records) > STATE_MAX_RECORDS:
+            newest = sorted(records.items(), key=lambda item: item[1][0], reverse=True)
+            records = dict(newest[:STATE_MAX_RECORDS])
+
+        index = bytearray()
+        payload = bytearray()
+        offset = _STATE_HEADER.size + len(records) * _STATE_INDEX.size
+        for key_hash in sorted(records):
+            updated, raw = records[key_hash]
+            entry = _STATE_INDEX.pack(key_hash, updated, offset + len(payload), len(raw), 0)[:-4]
+            index += entry + struct.pack("<I", zlib.crc32(entry))
+            payload += raw
+        header = _STATE_HEADER.pack(STATE_MAGIC, STATE_VERSION, 0, len(records), 0)[:-4]
+        header += struct.pack("<I", zlib.crc32(header))
+
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        # Under the lock, a temp file with our pid can only be left over from a crash
+        tmp_path = "{}.{}.tmp".format(self.path, os.getpid())
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        fd = os.open(tmp_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY | getattr(os, "O_BINARY", 0), 0o600)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(header + bytes(index) + bytes(payload))
+            os.replace(tmp_path, self.path)
+        except Exception:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+def parse_transcript_timestamp(timestamp_str):
+    """Parse a transcript timestamp; timestamps without an offset are local time"""
+    return localize(datetime.fromisoformat(timestamp_str.replace('Z', '+00:00')))
+
 def get_context_length_from_transcript(transcript_path):
     """Parse transcript JSONL to get current context length"""
     try:
         if not os.path.exists(transcript_path):
             return 0
 
-        with open(transcript_path, 'r', encoding='utf-8') as f:
+        with open(transcript_path, 'r', encoding='utf-8', errors='replace') as f:
             lines = f.readlines()
 
         most_recent_timestamp = None
@@ -65,7 +341,7 @@ def get_context_length_from_transcript(transcript_path):
                 if not usage or not timestamp_str:
                     continue
 
-                timestamp = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
+                timestamp = parse_transcript_timestamp(timestamp_str)
 
                 # Track most recent main chain entry
                 if most_recent_timestamp is None or timestamp > most_recent_timestamp:
@@ -83,7 +359,7 @@ def get_context_length_from_transcript(transcript_path):
     except Exception:
         return 0
 
-def get_block_start_time(transcript_path):
+def get_block_start_time(transcript_path, now=None):
     """
     Calculate the start time of current 5-hour block
     Based on ccstatusline logic
@@ -92,7 +368,7 @@ def get_block_start_time(transcript_path):
         if not transcript_path or not os.path.exists(transcript_path):
             return None
 
-        with open(transcript_path, 'r', encoding='utf-8') as f:
+        with open(transcript_path, 'r', encoding='utf-8', errors='replace') as f:
             lines = f.readlines()
 
         timestamps = []
@@ -108,7 +384,7 @@ def get_block_start_time(transcript_path):
 
                 timestamp_str = data.get('timestamp')
                 if timestamp_str:
-                    ts = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
+                    ts = parse_transcript_timestamp(timestamp_str)
                     timestamps.append(ts)
             except Exception:
                 continue
@@ -141,7 +417,7 @@ def get_block_start_time(transcript_path):
                     blocks.append({'start': current_block_start, 'end': current_block_end})
 
         # Find current block
-        now = datetime.now(timestamps[0].tzinfo) if timestamps else datetime.now()
+        now = now or current_time()
         for block in blocks:
             if block['start'] <= now <= block['end']:
                 return block['start']
@@ -152,6 +428,116 @@ def get_block_start_time(transcript_path):
     except Exception:
         return None
 
+def scan_transcript(transcript_path, state=None):
+    """
+    Bring a TranscriptState up to date by parsing only what was appended
+    since the previous scan. Starts over when the transcript was truncated
+    or rewritten, or when new entries predate the blocks already built.
+    """
+    with open(transcript_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if state is None or state.offset > size:
+            state = EMPTY_TRANSCRIPT_STATE
+        elif zlib.crc32(f.read(min(state.offset, STATE_HEAD_BYTES))) != state.head_crc:
+            state = EMPTY_TRANSCRIPT_STATE
+
+        f.seek(state.offset)
+        chunk = f.read()
+
+        # A trailing partial line is parsed now but re-read next time
+        offset = state.offset + chunk.rfind(b'\n') + 1
+        head_crc = state.head_crc
+        if state.offset < STATE_HEAD_BYTES:
+            f.seek(0)
+            head_crc = zlib.crc32(f.read(min(offset, STATE_HEAD_BYTES)))
+
+    context_length = state.context_length
+    context_ts = state.context_ts
+    block_timestamps = []
+
+    for line in chunk.splitlines():
+        try:
+            # Decode like the full-scan readers so both skip the same lines
+            data = json.loads(line.decode('utf-8', 'replace'))
+            # Skip sidechain and error messages
+            if data.get('isSidechain') or data.get('isApiErrorMessage'):
+                continue
+
+            usage = data.get('message', {}).get('usage', {})
+            timestamp_str = data.get('timestamp')
+
+            if not usage or not timestamp_str:
+                continue
+
+            timestamp = parse_transcript_timestamp(timestamp_str)
+            ts = timestamp.timestamp()
+            floored = timestamp.replace(minute=0, second=0, microsecond=0).timestamp()
+
+            if usage.get('input_tokens') and usage.get('output_tokens'):
+                block_timestamps.append((ts, floored))
+
+            # Track most recent main chain entry
+            if ts > context_ts:
+                context_ts = ts
+                context_length = (
+                    usage.get('input_tokens', 0) +
+                    usage.get('cache_read_input_tokens', 0) +
+                    usage.get('cache_creation_input_tokens', 0)
+                )
+        except Exception:
+            continue
+
+    block_timestamps.sort()
+    if block_timestamps and block_timestamps[0][0] < state.block_ts:
+        # Blocks are built from sorted timestamps, so an older entry means starting over
+        return scan_transcript(transcript_path)
+
+    blocks = list(state.blocks)
+    block_ts = state.block_ts
+    for ts, floored in block_timestamps:
+        if not blocks or ts > blocks[-1] + BLOCK_SECONDS:
+            blocks.append(floored)
+        block_ts = ts
+
+    return TranscriptState(offset, head_crc, context_length, context_ts, block_ts, tuple(blocks))
+
+def get_block_start_from_state(state, now=None):
+    """Start time of the current 5-hour block from scan state"""
+    if not state.blocks:
+        return None
+
+    now = (now or current_time()).timestamp()
+    for start in state.blocks:
+        if start <= now <= start + BLOCK_SECONDS:
+            return datetime.fromtimestamp(start, timezone.utc)
+
+    # If no current block found, return most recent block start
+    return datetime.fromtimestamp(state.blocks[-1], timezone.utc)
+
+def get_transcript_state(transcript_path):
+    """Scan the transcript incrementally, persisting progress in STATE_FILE"""
+    try:
+        if not transcript_path or not os.path.exists(transcript_path):
+            return None
+
+        key = os.path.abspath(transcript_path)
+        store = StateStore(STATE_FILE).load()
+        try:
+            previous = store.get(key)
+            state = scan_transcript(transcript_path, previous)
+            if state != previous:
+                # Persisting is best effort; the fresh state is still returned
+                try:
+                    store.put(key, state)
+                    store.save()
+                except (OSError, struct.error):
+                    pass
+        finally:
+            store.close()
+        return state
+    except Exception:
+        return None
+
 def get_git_info(cwd):
     """Get git branch and status"""
     try:
@@ -183,12 +569,13 @@ def get_git_info(cwd):
         pass
     return None, False
 
-def format_time_remaining(start_time):
+def format_time_remaining(start_time, now=None):
     """Format time remaining in 5-hour block"""
     try:
-        now = datetime.now(start_time.tzinfo)
+        now = now or current_time()
         block_duration = timedelta(hours=5)
-        block_end = start_time + block_duration
+        # Add the duration in UTC; same-zone arithmetic would ignore DST changes
+        block_end = localize(start_time).astimezone(timezone.utc) + block_duration
 
         remaining = block_end - now
         if remaining.total_seconds() <= 0:
@@ -202,18 +589,19 @@ def format_time_remaining(start_time):
     except Exception:
         return None, None, 0
 
-def calculate_fixed_cycle_time_remaining():
+def calculate_fixed_cycle_time_remaining(now=None, tz=None):
     """
     Calculate time remaining until next fixed cycle reset
-    Cycles are at: 6:00, 11:00, 16:00, 21:00 daily
+    Cycles are at: 6:00, 11:00, 16:00, 21:00 daily in tz (LOCAL_TZ by default)
     Returns: (hours, minutes, total_seconds, next_reset_time)
     """
     try:
         # Define cycle times in 24-hour format
         cycle_hours = [6, 11, 16, 21]
 
-        # Get current time
-        now = datetime.now()
+        # Get current wall clock time
+        tz = local_zone(tz)
+        now = (now or current_time()).astimezone(tz)
         current_hour = now.hour
         current_minute = now.minute
 
@@ -225,14 +613,18 @@ def calculate_fixed_cycle_time_remaining():
                 break
 
         # If no cycle found today, use first cycle of next day
+        wall = now.replace(tzinfo=None)
         if next_cycle_hour is None:
             next_cycle_hour = cycle_hours[0]
-            next_reset = now.replace(hour=next_cycle_hour, minute=0, second=0, microsecond=0) + timedelta(days=1)
+            next_reset = wall.replace(hour=next_cycle_hour, minute=0, second=0, microsecond=0) + timedelta(days=1)
         else:
-            next_reset = now.replace(hour=next_cycle_hour, minute=0, second=0, microsecond=0)
+            next_reset = wall.replace(hour=next_cycle_hour, minute=0, second=0, microsecond=0)
 
-        # Calculate remaining time
-        remaining = next_reset - now
+        # Resolve the reset wall time in tz so the offset follows DST changes
+        next_reset = localize(next_reset, tz)
+
+        # Calculate remaining time (in UTC, as same-zone subtraction ignores DST)
+        remaining = next_reset.astimezone(timezone.utc) - now.astimezone(timezone.utc)
         total_seconds = int(remaining.total_seconds())
 
         if total_seconds <= 0:
@@ -334,12 +726,12 @@ def format_progress_bar(percentage, width=10):
     except Exception:
         return ""
 
-def calculate_session_percentage(start_time_str, reset_time_str):
+def calculate_session_percentage(start_time_str, reset_time_str, now=None):
     """Calculate percentage of session elapsed"""
     try:
-        start_time = datetime.fromisoformat(start_time_str.replace('Z', '+00:00'))
-        reset_time = datetime.fromisoformat(reset_time_str.replace('Z', '+00:00'))
-        now = datetime.now(start_time.tzinfo)
+        start_time = localize(datetime.fromisoformat(start_time_str.replace('Z', '+00:00'))).astimezone(timezone.utc)
+        reset_time = localize(datetime.fromisoformat(reset_time_str.replace('Z', '+00:00'))).astimezone(timezone.utc)
+        now = now or current_time()
 
         total_duration = (reset_time - start_time).total_seconds()
         elapsed = (now - start_time).total_seconds()
@@ -352,205 +744,220 @@ def calculate_session_percentage(start_time_str, reset_time_str):
     except Exception:
         return 0
 
-try:
-    # Load input data
-    data = json.load(sys.stdin)
-
-    # Extract data
-    model = data.get("model", {}).get("display_name", "Claude")
-    workspace = data.get("workspace", {})
-    transcript_path = data.get("transcript_path", "")
-
-    cost_data = data.get("cost", {})
-    lines_added = cost_data.get("total_lines_added", 0)
-    lines_removed = cost_data.get("total_lines_removed", 0)
-
-    # Get git info
-    branch, is_dirty = get_git_info(workspace.get("current_dir", "."))
-
-    # Get context length from transcript
-    context_length = get_context_length_from_transcript(transcript_path)
-    context_percentage = (context_length / 200000) * 100 if context_length > 0 else 0
-
-    # Get block start time from transcript
-    block_start = get_block_start_time(transcript_path)
-
-    # Get usage info from ccusage
-    usage_info = get_usage_info_from_ccusage()
-
-    # Build status line parts
-    parts = []
-
-    # Model info
-    parts.append(f"{Colors.CYAN}{Colors.BOLD}🤖 {model}{Colors.RESET}")
-
-    # Git branch
-    if branch:
-        git_icon = "🔴" if is_dirty else "🌿"
-        parts.append(f"{Colors.GREEN}{git_icon} {branch}{Colors.RESET}")
-
-    # Session timer - Choose calculation method based on configuration
-    if USE_FIXED_CYCLES:
-        # Use fixed cycle times (6h, 11h, 16h, 21h)
-        hours_left, minutes_left, seconds_left, next_reset = calculate_fixed_cycle_time_remaining()
-        if seconds_left and seconds_left > 0:
-            # Color based on remaining time
-            if seconds_left > 3600:  # More than 1 hour
-                time_color = Colors.GREEN
-            elif seconds_left > 1800:  # More than 30 minutes
-                time_color = Colors.YELLOW
-            else:
-                time_color = Colors.RED
+def main():
+    # Fix encoding on Windows
+    if sys.platform == "win32":
+        sys.stdin = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8')
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 
-            # Format time string
-            if hours_left and hours_left > 0:
-                time_str = f"{hours_left}h {minutes_left}m"
-            else:
-                time_str = f"{minutes_left}m"
-
-            # Format reset time
-            reset_hm = next_reset.strftime("%H:%M") if next_reset else ""
-
-            # Calculate usage percentage based on cost
-            usage_pct = 0
-            if usage_info:
-                current_cost = usage_info.get('cost_usd', 0)
-                if current_cost > 0:
-                    usage_pct = int((current_cost / COST_LIMIT_PER_SESSION) * 100)
-                    usage_pct = max(0, min(100, usage_pct))  # Clamp to 0-100%
-
-            # Build session info with usage percentage
-            if usage_pct > 0:
-                session_info = f"⏱ {time_str} until reset at {reset_hm} ({usage_pct}%)"
-            else:
-                session_info = f"⏱ {time_str} until reset at {reset_hm}"
+    try:
+        # Load input data
+        data = json.load(sys.stdin)
 
-            parts.append(f"{time_color}{session_info}{Colors.RESET}")
+        # Extract data
+        model = data.get("model", {}).get("display_name", "Claude")
+        workspace = data.get("workspace", {})
+        transcript_path = data.get("transcript_path", "")
 
-    # Session timer from ccusage (prioritize over block_start)
-    elif usage_info and usage_info.get('reset_time'):
-        try:
-            reset_time = datetime.fromisoformat(usage_info['reset_time'].replace('Z', '+00:00'))
-            now = datetime.now(reset_time.tzinfo)
-            remaining = reset_time - now
-
-            if remaining.total_seconds() > 0:
-                total_seconds = int(remaining.total_seconds())
-                hours = total_seconds // 3600
-                minutes = (total_seconds % 3600) // 60
-
-                # Calculate session percentage
-                session_pct = 0
-                if usage_info.get('start_time'):
-                    session_pct = calculate_session_percentage(
-                        usage_info['start_time'],
-                        usage_info['reset_time']
-                    )
+        cost_data = data.get("cost", {})
+        lines_added = cost_data.get("total_lines_added", 0)
+        lines_removed = cost_data.get("total_lines_removed", 0)
 
-                # Color based on remaining percentage
-                remaining_pct = 100 - session_pct
-                if remaining_pct <= 10:
-                    time_color = Colors.RED
-                elif remaining_pct <= 25:
+        # Evaluate every time calculation against the same instant
+        now = current_time()
+
+        # Get git info
+        branch, is_dirty = get_git_info(workspace.get("current_dir", "."))
+
+        # Get context length and block start time from transcript
+        transcript_state = get_transcript_state(transcript_path) if USE_STATE_CACHE else None
+        if transcript_state is not None:
+            context_length = transcript_state.context_length
+            block_start = get_block_start_from_state(transcript_state, now)
+        else:
+            context_length = get_context_length_from_transcript(transcript_path)
+            block_start = get_block_start_time(transcript_path, now)
+        context_percentage = (context_length / 200000) * 100 if context_length > 0 else 0
+
+        # Get usage info from ccusage
+        usage_info = get_usage_info_from_ccusage()
+
+        # Build status line parts
+        parts = []
+
+        # Model info
+        parts.append(f"{Colors.CYAN}{Colors.BOLD}🤖 {model}{Colors.RESET}")
+
+        # Git branch
+        if branch:
+            git_icon = "🔴" if is_dirty else "🌿"
+            parts.append(f"{Colors.GREEN}{git_icon} {branch}{Colors.RESET}")
+
+        # Session timer - Choose calculation method based on configuration
+        if USE_FIXED_CYCLES:
+            # Use fixed cycle times (6h, 11h, 16h, 21h)
+            hours_left, minutes_left, seconds_left, next_reset = calculate_fixed_cycle_time_remaining(now)
+            if seconds_left and seconds_left > 0:
+                # Color based on remaining time
+                if seconds_left > 3600:  # More than 1 hour
+                    time_color = Colors.GREEN
+                elif seconds_left > 1800:  # More than 30 minutes
                     time_color = Colors.YELLOW
                 else:
-                    time_color = Colors.GREEN
+                    time_color = Colors.RED
 
                 # Format time string
-                if hours > 0:
-                    time_str = f"{hours}h {minutes}m"
+                if hours_left and hours_left > 0:
+                    time_str = f"{hours_left}h {minutes_left}m"
                 else:
-                    time_str = f"{minutes}m"
+                    time_str = f"{minutes_left}m"
 
                 # Format reset time
-                reset_hm = reset_time.strftime("%H:%M")
-
-                # Build session info
-                session_info = f"⏱ {time_str} until reset at {reset_hm} ({session_pct}%)"
+                reset_hm = next_reset.strftime("%H:%M") if next_reset else ""
+
+                # Calculate usage percentage based on cost
+                usage_pct = 0
+                if usage_info:
+                    current_cost = usage_info.get('cost_usd', 0)
+                    if current_cost > 0:
+                        usage_pct = int((current_cost / COST_LIMIT_PER_SESSION) * 100)
+                        usage_pct = max(0, min(100, usage_pct))  # Clamp to 0-100%
+
+                # Build session info with usage percentage
+                if usage_pct > 0:
+                    session_info = f"⏱ {time_str} until reset at {reset_hm} ({usage_pct}%)"
+                else:
+                    session_info = f"⏱ {time_str} until reset at {reset_hm}"
 
-                # Add progress bar
-                progress = format_progress_bar(session_pct, 10)
+                parts.append(f"{time_color}{session_info}{Colors.RESET}")
 
-                parts.append(f"{time_color}{session_info} {progress}{Colors.RESET}")
-        except Exception:
-            # Fallback to block_start if ccusage parsing fails
-            if block_start:
-                hours_left, minutes_left, seconds_left = format_time_remaining(block_start)
-                if seconds_left and seconds_left > 0:
-                    if seconds_left > 3600:
-                        time_color = Colors.GREEN
-                    elif seconds_left > 1800:
+        # Session timer from ccusage (prioritize over block_start)
+        elif usage_info and usage_info.get('reset_time'):
+            try:
+                reset_time = localize(datetime.fromisoformat(usage_info['reset_time'].replace('Z', '+00:00')))
+                remaining = reset_time.astimezone(timezone.utc) - now.astimezone(timezone.utc)
+
+                if remaining.total_seconds() > 0:
+                    total_seconds = int(remaining.total_seconds())
+                    hours = total_seconds // 3600
+                    minutes = (total_seconds % 3600) // 60
+
+                    # Calculate session percentage
+                    session_pct = 0
+                    if usage_info.get('start_time'):
+                        session_pct = calculate_session_percentage(
+                            usage_info['start_time'],
+                            usage_info['reset_time'],
+                            now
+                        )
+
+                    # Color based on remaining percentage
+                    remaining_pct = 100 - session_pct
+                    if remaining_pct <= 10:
+                        time_color = Colors.RED
+                    elif remaining_pct <= 25:
                         time_color = Colors.YELLOW
                     else:
-                        time_color = Colors.RED
+                        time_color = Colors.GREEN
 
-                    if hours_left and hours_left > 0:
-                        time_str = f"{hours_left}h {minutes_left}m"
+                    # Format time string
+                    if hours > 0:
+                        time_str = f"{hours}h {minutes}m"
                     else:
-                        time_str = f"{minutes_left}m"
-
-                    parts.append(f"{time_color}⏳ {time_str}{Colors.RESET}")
-    elif block_start:
-        # Fallback to original block_start countdown
-        hours_left, minutes_left, seconds_left = format_time_remaining(block_start)
-        if seconds_left and seconds_left > 0:
-            if seconds_left > 3600:
-                time_color = Colors.GREEN
-            elif seconds_left > 1800:
-                time_color = Colors.YELLOW
-            else:
-                time_color = Colors.RED
+                        time_str = f"{minutes}m"
 
-            if hours_left and hours_left > 0:
-                time_str = f"{hours_left}h {minutes_left}m"
-            else:
-                time_str = f"{minutes_left}m"
-
-            parts.append(f"{time_color}⏳ {time_str}{Colors.RESET}")
-
-    # Usage stats from ccusage
-    if usage_info:
-        # Requests/entries count
-        entries = usage_info.get('entries', 0)
-        if entries > 0:
-            parts.append(f"{Colors.BLUE}💬 {entries} requests{Colors.RESET}")
-
-        # Tokens used
-        total_tokens = usage_info.get('total_tokens', 0)
-        if total_tokens > 0:
-            tokens_str = f"{total_tokens:,}"
-            tokens_per_min = usage_info.get('tokens_per_minute', 0)
-            if tokens_per_min > 0:
-                parts.append(f"{Colors.PURPLE}📊 {tokens_str} tok ({tokens_per_min:.0f} tpm){Colors.RESET}")
+                    # Format reset time
+                    reset_hm = reset_time.astimezone(local_zone()).strftime("%H:%M")
+
+                    # Build session info
+                    session_info = f"⏱ {time_str} until reset at {reset_hm} ({session_pct}%)"
+
+                    # Add progress bar
+                    progress = format_progress_bar(session_pct, 10)
+
+                    parts.append(f"{time_color}{session_info} {progress}{Colors.RESET}")
+            except Exception:
+                # Fallback to block_start if ccusage parsing fails
+                if block_start:
+                    hours_left, minutes_left, seconds_left = format_time_remaining(block_start, now)
+                    if seconds_left and seconds_left > 0:
+                        if seconds_left > 3600:
+                            time_color = Colors.GREEN
+                        elif seconds_left > 1800:
+                            time_color = Colors.YELLOW
+                        else:
+                            time_color = Colors.RED
+
+                        if hours_left and hours_left > 0:
+                            time_str = f"{hours_left}h {minutes_left}m"
+                        else:
+                            time_str = f"{minutes_left}m"
+
+                        parts.append(f"{time_color}⏳ {time_str}{Colors.RESET}")
+        elif block_start:
+            # Fallback to original block_start countdown
+            hours_left, minutes_left, seconds_left = format_time_remaining(block_start, now)
+            if seconds_left and seconds_left > 0:
+                if seconds_left > 3600:
+                    time_color = Colors.GREEN
+                elif seconds_left > 1800:
+                    time_color = Colors.YELLOW
+                else:
+                    time_color = Colors.RED
+
+                if hours_left and hours_left > 0:
+                    time_str = f"{hours_left}h {minutes_left}m"
+                else:
+                    time_str = f"{minutes_left}m"
+
+                parts.append(f"{time_color}⏳ {time_str}{Colors.RESET}")
+
+        # Usage stats from ccusage
+        if usage_info:
+            # Requests/entries count
+            entries = usage_info.get('entries', 0)
+            if entries > 0:
+                parts.append(f"{Colors.BLUE}💬 {entries} requests{Colors.RESET}")
+
+            # Tokens used
+            total_tokens = usage_info.get('total_tokens', 0)
+            if total_tokens > 0:
+                tokens_str = f"{total_tokens:,}"
+                tokens_per_min = usage_info.get('tokens_per_minute', 0)
+                if tokens_per_min > 0:
+                    parts.append(f"{Colors.PURPLE}📊 {tokens_str} tok ({tokens_per_min:.0f} tpm){Colors.RESET}")
+                else:
+                    parts.append(f"{Colors.PURPLE}📊 {tokens_str} tok{Colors.RESET}")
+
+            # Cost
+            cost_usd = usage_info.get('cost_usd', 0)
+            if cost_usd > 0:
+                parts.append(f"{Colors.YELLOW}💵 ${cost_usd:.2f}{Colors.RESET}")
+
+        # Context window percentage
+        if context_length > 0:
+            if context_percentage < 50:
+                color = Colors.GREEN
+            elif context_percentage < 80:
+                color = Colors.YELLOW
             else:
-                parts.append(f"{Colors.PURPLE}📊 {tokens_str} tok{Colors.RESET}")
-
-        # Cost
-        cost_usd = usage_info.get('cost_usd', 0)
-        if cost_usd > 0:
-            parts.append(f"{Colors.YELLOW}💵 ${cost_usd:.2f}{Colors.RESET}")
-
-    # Context window percentage
-    if context_length > 0:
-        if context_percentage < 50:
-            color = Colors.GREEN
-        elif context_percentage < 80:
-            color = Colors.YELLOW
-        else:
-            color = Colors.RED
-        parts.append(f"{color}📈 {context_percentage:.1f}%{Colors.RESET}")
+                color = Colors.RED
+            parts.append(f"{color}📈 {context_percentage:.1f}%{Colors.RESET}")
+
+        # Code stats
+        if lines_added > 0 or lines_removed > 0:
+            parts.append(f"{Colors.GREEN}+{lines_added}{Colors.RESET} {Colors.RED}-{lines_removed}{Colors.RESET}")
 
-    # Code stats
-    if lines_added > 0 or lines_removed > 0:
-        parts.append(f"{Colors.GREEN}+{lines_added}{Colors.RESET} {Colors.RED}-{lines_removed}{Colors.RESET}")
+        # Join with separator
+        separator = f" {Colors.GRAY}│{Colors.RESET} "
+        output = separator.join(parts)
 
-    # Join with separator
-    separator = f" {Colors.GRAY}│{Colors.RESET} "
-    output = separator.join(parts)
+        print(output, flush=True)
 
-    print(output, flush=True)
+    except Exception as e:
+        # Fallback to simple display
+        print(f"{Colors.RED}❌ Error: {e}{Colors.RESET}", file=sys.stderr)
+        sys.exit(1)
 
-except Exception as e:
-    # Fallback to simple display
-    print(f"{Colors.RED}❌ Error: {e}{Colors.RESET}", file=sys.stderr)
-    sys.exit(1)
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Test the persisted scan state store and the incremental transcript scanner"""
+import sys, io, os, json, subprocess, tempfile
+from datetime import datetime, timedelta, timezone
+
+import statusline
+
+START = datetime(2026, 10, 19, 8, 0, tzinfo=timezone.utc)
+
+def entry(ts, input_tokens=10, output_tokens=5, cache_read=1000, timestamp_str=None):
+    """One transcript line"""
+    return json.dumps({
+        'timestamp': timestamp_str or ts.isoformat().replace('+00:00', 'Z'),
+        'message': {'usage': {
+            'input_tokens': input_tokens,
+            'output_tokens': output_tokens,
+            'cache_read_input_tokens': cache_read,
+        }},
+    })
+
+def session(start, count, gap):
+    """count entries starting at start, gap apart, with growing context"""
+    return [entry(start + i * gap, cache_read=1000 * (i + 1)) for i in range(count)]
+
+class TempState:
+    """Point statusline.STATE_FILE at a temporary directory"""
+
+    def __enter__(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self._original = statusline.STATE_FILE
+        statusline.STATE_FILE = os.path.join(self._tmp.name, 'state.bin')
+        self.transcript_path = os.path.join(self._tmp.name, 'transcript.jsonl')
+        return self
+
+    def __exit__(self, *exc_info):
+        statusline.STATE_FILE = self._original
+        self._tmp.cleanup()
+
+    def write(self, lines, mode='w'):
+        with open(self.transcript_path, mode, encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+
+def assert_matches_full_scan(transcript_path, now):
+    state = statusline.get_transcript_state(transcript_path)
+    assert state.context_length == statusline.get_context_length_from_transcript(transcript_path)
+    assert (statusline.get_block_start_from_state(state, now) ==
+            statusline.get_block_start_time(transcript_path, now))
+    return state
+
+def test_appended_lines_match_full_rescan():
+    lines = session(START, 30, timedelta(minutes=50))
+    now = START + timedelta(days=2)
+    with TempState() as tmp:
+        tmp.write(lines[:10])
+        first = assert_matches_full_scan(tmp.transcript_path, now)
+        for i in range(10, 30, 4):
+            tmp.write(lines[i:i + 4], mode='a')
+            state = assert_matches_full_scan(tmp.transcript_path, now)
+        assert first.offset < state.offset == os.path.getsize(tmp.transcript_path)
+
+def test_rewritten_transcript_is_rescanned():
+    now = START + timedelta(days=4)
+    first = session(START, 20, timedelta(minutes=40))
+    second = session(START + timedelta(days=3), 20, timedelta(minutes=20))
+    with TempState() as tmp:
+        for lines in (first, second, second[:10]):
+            tmp.write(lines)
+            assert_matches_full_scan(tmp.transcript_path, now)
+
+def test_out_of_order_entry_matches_full_rescan():
+    now = START + timedelta(days=1)
+    with TempState() as tmp:
+        # 08:00 and 14:00 start blocks, 18:30 falls inside the 14:00 block
+        tmp.write([entry(START), entry(START + timedelta(hours=6)), entry(START + timedelta(hours=10, minutes=30))])
+        assert_matches_full_scan(tmp.transcript_path, now)
+        # A late 13:10 entry moves the second block to 13:00, so 18:30 starts a third
+        tmp.write([entry(START + timedelta(hours=5, minutes=10))], mode='a')
+        state = assert_matches_full_scan(tmp.transcript_path, now)
+        assert len(state.blocks) == 3
+
+def test_invalid_utf8_line_matches_full_scan():
+    now = START + timedelta(hours=3)
+    with TempState() as tmp:
+        with open(tmp.transcript_path, 'wb') as f:
+            f.write(entry(START + timedelta(hours=2), cache_read=0).encode('utf-8') + b'\n')
+            f.write(b'{"timestamp": "\xff\xfe", "message": {}}\n')
+            f.write(b'{"note": "caf\xe9", ' + entry(START + timedelta(hours=2, minutes=30), cache_read=5).encode('utf-8')[1:] + b'\n')
+            f.write(b'\xc3\x28 not json\n')
+        state = assert_matches_full_scan(tmp.transcript_path, now)
+        assert state.context_length == 15
+        assert statusline.get_block_start_from_state(state, now) == START + timedelta(hours=2)
+
+def test_naive_timestamps_match_full_scan():
+    # Naive timestamps are wall clock time in LOCAL_TZ, not the host time zone
+    now = START + timedelta(hours=7)
+    original = statusline.LOCAL_TZ
+    statusline.LOCAL_TZ = timezone(timedelta(hours=-4))
+    try:
+        with TempState() as tmp:
+            tmp.write([
+                entry(None, timestamp_str='2026-10-19T10:00:00'),
+                entry(None, timestamp_str='2026-10-19T10:30:00+07:00', cache_read=7),
+            ])
+            state = assert_matches_full_scan(tmp.transcript_path, now)
+            block_start = statusline.get_block_start_from_state(state, now)
+            full_block_start = statusline.get_block_start_time(tmp.transcript_path, now)
+    finally:
+        statusline.LOCAL_TZ = original
+    assert state.context_length == 1010
+    assert block_start == datetime(2026, 10, 19, 14, 0, tzinfo=timezone.utc)
+    assert full_block_start.astimezone(timezone(timedelta(hours=-4))).hour == 10
+    assert (statusline.format_time_remaining(block_start, now) ==
+            statusline.format_time_remaining(full_block_start, now) == (4, 0, 14400))
+
+def test_failed_save_still_returns_state():
+    original = statusline.STATE_FILE
+    with tempfile.TemporaryDirectory() as tmp:
+        transcript_path = os.path.join(tmp, 'transcript.jsonl')
+        with open(transcript_path, 'w', encoding='utf-8') as f:
+            f.write(entry(START) + '\n')
+        # A state file inside a regular file can never be created
+        statusline.STATE_FILE = os.path.join(transcript_path, 'state.bin')
+        try:
+            state = statusline.get_transcript_state(transcript_path)
+        finally:
+            statusline.STATE_FILE = original
+        assert state is not None and state.context_length == 1010
+
+def test_state_store_invalidation():
+    state = statusline.TranscriptState(120, 7, 4242, 1.5e9, 1.5e9, (1.4e9, 1.5e9))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'state.bin')
+        store = statusline.StateStore(path).load()
+        store.put('a', state)
+        store.put('b', state._replace(offset=9))
+        store.save()
+
+        store = statusline.StateStore(path).load()
+        assert store.get('a') == state
+        assert store.get('b').offset == 9
+        assert store.get('c') is None
+        store.close()
+
+        # Corrupt the last byte of the last record
+        with open(path, 'r+b') as f:
+            f.seek(-1, os.SEEK_END)
+            byte = f.read(1)
+            f.seek(-1, os.SEEK_END)
+            f.write(bytes([byte[0] ^ 0xFF]))
+        store = statusline.StateStore(path).load()
+        assert [store.get('a'), store.get('b')].count(None) == 1
+        store.close()
+
+        # A different schema version discards everything
+        original = statusline.STATE_VERSION
+        statusline.STATE_VERSION = original + 1
+        try:
+            store = statusline.StateStore(path).load()
+            assert store.get('a') is None and store.get('b') is None
+            store.close()
+        finally:
+            statusline.STATE_VERSION = original
+
+def test_corrupt_index_entry_is_a_miss():
+    state = statusline.TranscriptState(1, 0, 0, 0.0, 0.0, ())
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'state.bin')
+        store = statusline.StateStore(path).load()
+        for key in 'abc':
+            store.put(key, state)
+        store.save()
+
+        # Flip a byte in every index entry's updated field
+        with open(path, 'r+b') as f:
+            for i in range(3):
+                f.seek(statusline._STATE_HEADER.size + i * statusline._STATE_INDEX.size + 8)
+                byte = f.read(1)
+                f.seek(-1, os.SEEK_CUR)
+                f.write(bytes([byte[0] ^ 0xFF]))
+        store = statusline.StateStore(path).load()
+        assert [store.get(key) for key in 'abc'] == [None, None, None]
+
+        # Saving drops the corrupt entries and keeps new ones
+        store.put('d', state)
+        store.save()
+        store = statusline.StateStore(path).load()
+        assert store.get('d') == state and store.get('a') is None
+        store.close()
+
+def test_concurrent_saves_are_merged():
+    state = statusline.TranscriptState(1, 0, 0, 0.0, 0.0, ())
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'state.bin')
+        # Two sessions load the same (empty) file, then save one after the other
+        first = statusline.StateStore(path).load()
+        second = statusline.StateStore(path).load()
+        first.put('first', state)
+        first.save()
+        second.put('second', state)
+        second.save()
+
+        store = statusline.StateStore(path).load()
+        assert store.get('first') == state and store.get('second') == state
+        store.close()
+
+def test_no_slow_imports_at_startup():
+    # Every refresh is a new process; hashlib and tempfile alone add ~7 ms
+    code = "import statusline, sys; print(sorted(m for m in ('hashlib', 'tempfile') if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(statusline.__file__)))
+    assert result.stdout.strip() == "[]", result.stdout + result.stderr
+
+if __name__ == "__main__":
+    # Fix encoding on Windows
+    if sys.platform == "win32":
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+    print("Testing persisted scan state:\n")
+    for name, test in sorted(globals().items()):
+        if name.startswith('test_') and callable(test):
+            try:
+                test()
+                print(f"✅ {name}")
+            except AssertionError as e:
+                print(f"❌ {name}: {e}")
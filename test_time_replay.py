@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Replay transcripts at simulated times and compare cached results to a full recompute"""
+import sys, io, os, json, random, tempfile
+from datetime import datetime, timedelta, timezone
+from unittest import SkipTest
+
+import statusline
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # Python < 3.9
+    ZoneInfo = None
+
+SEEDS = range(100)
+CYCLE_HOURS = (6, 11, 16, 21)
+
+# Recorded in New York across the 2026-03-08 DST change (02:00 EST -> 03:00 EDT)
+RECORDED_TRANSCRIPT = [
+    '{"timestamp": "2026-03-07T21:40:12.250-05:00", "message": {"usage": {"input_tokens": 12, "output_tokens": 80, "cache_read_input_tokens": 15200}}}',
+    '{"timestamp": "2026-03-07T21:41:03.004-05:00", "message": {"usage": {"input_tokens": 3, "output_tokens": 41, "cache_read_input_tokens": 15420, "cache_creation_input_tokens": 310}}}',
+    '{"timestamp": "2026-03-07T23:58:40.731-05:00", "isSidechain": true, "message": {"usage": {"input_tokens": 9, "output_tokens": 12, "cache_read_input_tokens": 900}}}',
+    '{"timestamp": "2026-03-08T00:02:19.118-05:00", "message": {"usage": {"input_tokens": 250, "output_tokens": 80, "cache_read_input_tokens": 18800}}}',
+    '{"timestamp": "2026-03-08T01:59:58.500-05:00", "message": {"usage": {"input_tokens": 4, "output_tokens": 1, "cache_read_input_tokens": 19050}}}',
+    '{"timestamp": "2026-03-08T03:00:01.020-04:00", "message": {"usage": {"input_tokens": 7, "output_tokens": 66, "cache_read_input_tokens": 19300, "cache_creation_input_tokens": 1200}}}',
+    '{"timestamp": "2026-03-08T07:15:30.000Z", "message": {"usage": {"input_tokens": 5, "output_tokens": 20, "cache_read_input_tokens": 20600}}}',
+    '{"timestamp": "2026-03-08T03:20:44.902-04:00", "isApiErrorMessage": true, "message": {"usage": {"input_tokens": 1, "output_tokens": 1}}}',
+    '{"timestamp": "2026-03-08T06:05:11.377-04:00", "message": {"usage": {"input_tokens": 18, "output_tokens": 240, "cache_read_input_tokens": 21010}}}',
+    '{"timestamp": "2026-03-08T05:50:00.000-04:00", "message": {"usage": {"input_tokens": 2, "output_tokens": 9, "cache_read_input_tokens": 20990}}}',
+    '{"timestamp": "2026-03-08T11:30:00.000-04:00", "message": {"usage": {"input_tokens": 44, "output_tokens": 310, "cache_read_input_tokens": 4800}}}',
+    '{"timestamp": "2026-03-08T23:59:59.999-04:00", "message": {"usage": {"input_tokens": 6, "output_tokens": 15, "cache_read_input_tokens": 9100}}}',
+    '{"timestamp": "2026-03-09T00:00:00.000-04:00", "message": {"usage": {"input_tokens": 6, "output_tokens": 15, "cache_read_input_tokens": 9400}}}',
+]
+
+def require_zoneinfo():
+    if ZoneInfo is None:
+        raise SkipTest("zoneinfo needs Python 3.9+")
+
+def make_entry(rng, ts, tz):
+    """Random transcript entry at ts, including ones the scanners must skip"""
+    kind = rng.random()
+    # Claude Code writes UTC; mix in entries carrying the local offset
+    if rng.random() < 0.3:
+        timestamp = ts.astimezone(tz).isoformat()
+    else:
+        timestamp = ts.astimezone(timezone.utc).isoformat().replace('+00:00', 'Z')
+    entry = {
+        'timestamp': timestamp,
+        'message': {'usage': {
+            'input_tokens': rng.choice([0, 3, 12, 250]),
+            'output_tokens': rng.choice([0, 1, 80]),
+            'cache_read_input_tokens': rng.randint(0, 150000),
+            'cache_creation_input_tokens': rng.randint(0, 5000),
+        }},
+    }
+    if kind < 0.05:
+        entry['isSidechain'] = True
+    elif kind < 0.1:
+        entry['isApiErrorMessage'] = True
+    elif kind < 0.15:
+        entry['message'] = {}
+    elif kind < 0.18:
+        del entry['timestamp']
+    return json.dumps(entry)
+
+def record_transcript(rng, start, tz):
+    """A recorded session: bursts of activity separated by idle gaps"""
+    ts = start
+    lines = []
+    for _ in range(rng.randint(1, 80)):
+        if rng.random() < 0.1:
+            # Land exactly on the end of a 5-hour block
+            ts = ts.replace(minute=0, second=0, microsecond=0) + timedelta(hours=5)
+        else:
+            ts += timedelta(seconds=rng.choice([5, 40, 600, 3600, 4 * 3600, 9 * 3600]), microseconds=rng.randint(0, 999999))
+        # Occasionally log an entry out of order
+        jitter = timedelta(seconds=-rng.choice([1, 120, 6 * 3600])) if rng.random() < 0.1 else timedelta()
+        lines.append(make_entry(rng, ts + jitter, tz))
+        if rng.random() < 0.03:
+            lines.append('not json')
+    return lines
+
+class SimulatedClock:
+    """Injectable clock for statusline.CLOCK"""
+
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+def expected_fixed_cycle(now, tz):
+    """Next reset found from scratch: the first 06/11/16/21h wall time in tz after now"""
+    today = now.astimezone(tz).date()
+    for days in range(3):
+        day = today + timedelta(days=days)
+        for hour in CYCLE_HOURS:
+            reset = datetime(day.year, day.month, day.day, hour, tzinfo=tz)
+            if reset > now:
+                return int((reset - now).total_seconds()), reset.strftime("%H:%M")
+
+def run_main(transcript_path):
+    """Status line printed by statusline.main() for one refresh"""
+    payload = {'model': {'display_name': 'Test'}, 'workspace': {'current_dir': '.'},
+               'transcript_path': transcript_path, 'cost': {}}
+    stdin, stdout = sys.stdin, sys.stdout
+    sys.stdin = io.TextIOWrapper(io.BytesIO(json.dumps(payload).encode('utf-8')), encoding='utf-8')
+    sys.stdout = io.TextIOWrapper(io.BytesIO(), encoding='utf-8')
+    try:
+        statusline.main()
+        sys.stdout.flush()
+        return sys.stdout.buffer.getvalue().decode('utf-8')
+    finally:
+        sys.stdin, sys.stdout = stdin, stdout
+
+def check_refresh(transcript_path, tz):
+    """Compare one refresh against a full recompute and a from-scratch countdown"""
+    state = statusline.get_transcript_state(transcript_path)
+    cached = (state.context_length, statusline.get_block_start_from_state(state))
+    full = (statusline.get_context_length_from_transcript(transcript_path),
+            statusline.get_block_start_time(transcript_path))
+    assert cached == full, (cached, full)
+    if full[1] is not None:
+        assert statusline.format_time_remaining(cached[1]) == statusline.format_time_remaining(full[1])
+
+    output = run_main(transcript_path)
+    seconds, reset_hm = expected_fixed_cycle(statusline.current_time(), tz)
+    hours, minutes = seconds // 3600, (seconds % 3600) // 60
+    time_str = f"{hours}h {minutes}m" if hours > 0 else f"{minutes}m"
+    assert f"⏱ {time_str} until reset at {reset_hm}" in output, (statusline.current_time(), output)
+    if full[0] > 0:
+        assert f"📈 {full[0] / 200000 * 100:.1f}%" in output, output
+
+def replay(seed, lines, start, tz):
+    """Append a recorded transcript in chunks, checking every refresh at simulated times in tz"""
+    rng = random.Random(seed)
+    original = (statusline.CLOCK, statusline.STATE_FILE, statusline.LOCAL_TZ,
+                statusline.USE_FIXED_CYCLES, statusline.get_git_info, statusline.get_usage_info_from_ccusage)
+    with tempfile.TemporaryDirectory() as tmp:
+        transcript_path = os.path.join(tmp, 'transcript.jsonl')
+        statusline.STATE_FILE = os.path.join(tmp, 'state.bin')
+        statusline.LOCAL_TZ = tz
+        statusline.USE_FIXED_CYCLES = True
+        statusline.get_git_info = lambda cwd: (None, False)
+        statusline.get_usage_info_from_ccusage = lambda: None
+        clock = statusline.CLOCK = SimulatedClock(start)
+        try:
+            open(transcript_path, 'w').close()
+            written = 0
+            while written < len(lines):
+                step = rng.randint(1, 6)
+                chunk = lines[written:written + step]
+                written += step
+                with open(transcript_path, 'a', encoding='utf-8') as f:
+                    f.write('\n'.join(chunk) + '\n')
+                    # Simulate a refresh while an entry is still being written
+                    if rng.random() < 0.1:
+                        f.write('{"timestamp": "2')
+
+                for _ in range(rng.randint(1, 3)):
+                    clock.now += timedelta(minutes=rng.choice([0, 1, 7, 30, 180, 310, 1440]))
+                    try:
+                        check_refresh(transcript_path, tz)
+                    except AssertionError as e:
+                        raise AssertionError((seed, written) + e.args)
+
+                # Drop the partial entry again before appending more
+                with open(transcript_path, 'r', encoding='utf-8') as f:
+                    content = f.read()
+                with open(transcript_path, 'w', encoding='utf-8') as f:
+                    f.write(content[:content.rfind('\n') + 1])
+        finally:
+            (statusline.CLOCK, statusline.STATE_FILE, statusline.LOCAL_TZ, statusline.USE_FIXED_CYCLES,
+             statusline.get_git_info, statusline.get_usage_info_from_ccusage) = original
+
+def replay_generated(start, tz):
+    for seed in SEEDS:
+        replay(seed, record_transcript(random.Random(seed), start, tz), start, tz)
+
+def test_replay_matches_full_recompute():
+    replay_generated(datetime(2026, 10, 18, 23, 30, tzinfo=timezone.utc), timezone.utc)
+
+def test_replay_across_local_midnight():
+    # Starts 30 minutes before midnight at UTC+7
+    replay_generated(datetime(2026, 10, 18, 16, 30, tzinfo=timezone.utc), timezone(timedelta(hours=7)))
+
+def test_replay_across_dst_changes():
+    require_zoneinfo()
+    tz = ZoneInfo("America/New_York")
+    # US DST starts 2026-03-08 and ends 2026-11-01
+    replay_generated(datetime(2026, 3, 7, 20, 0, tzinfo=timezone.utc), tz)
+    replay_generated(datetime(2026, 10, 31, 20, 0, tzinfo=timezone.utc), tz)
+
+def test_replay_recorded_transcript_across_dst():
+    require_zoneinfo()
+    tz = ZoneInfo("America/New_York")
+    for seed in SEEDS:
+        replay(seed, RECORDED_TRANSCRIPT, datetime(2026, 3, 8, 2, 0, tzinfo=timezone.utc), tz)
+
+def test_fixed_cycle_midnight_rollover():
+    tz = timezone(timedelta(hours=7))
+    cases = [
+        (datetime(2026, 10, 19, 23, 59, tzinfo=tz), datetime(2026, 10, 20, 6, 0, tzinfo=tz)),
+        (datetime(2026, 10, 20, 0, 0, tzinfo=tz), datetime(2026, 10, 20, 6, 0, tzinfo=tz)),
+        (datetime(2026, 12, 31, 21, 0, tzinfo=tz), datetime(2027, 1, 1, 6, 0, tzinfo=tz)),
+    ]
+    for now, expected in cases:
+        hours, minutes, seconds, next_reset = statusline.calculate_fixed_cycle_time_remaining(now, tz)
+        assert next_reset == expected, now
+        assert seconds == int((expected - now).total_seconds())
+
+def test_fixed_cycle_across_dst():
+    require_zoneinfo()
+    tz = ZoneInfo("America/New_York")
+    # 01:00 EST -> 06:00 EDT is 4 hours; 01:00 EDT -> 06:00 EST is 6 hours
+    for now_utc, expected_hours in [(datetime(2026, 3, 8, 6, 0, tzinfo=timezone.utc), 4),
+                                    (datetime(2026, 11, 1, 5, 0, tzinfo=timezone.utc), 6)]:
+        hours, minutes, _, next_reset = statusline.calculate_fixed_cycle_time_remaining(now_utc, tz)
+        assert (hours, minutes) == (expected_hours, 0), now_utc
+        assert next_reset.hour == 6
+
+def test_fixed_cycle_properties():
+    require_zoneinfo()
+    rng = random.Random(1)
+    tz = ZoneInfo("America/New_York")
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    for _ in range(2000):
+        now = start + timedelta(seconds=rng.randint(0, 365 * 86400))
+        hours, minutes, seconds, next_reset = statusline.calculate_fixed_cycle_time_remaining(now, tz)
+        assert next_reset.hour in (6, 11, 16, 21) and next_reset.minute == 0
+        assert 0 < seconds <= 11 * 3600, now
+        assert seconds == int((next_reset - now).total_seconds())
+        assert (hours, minutes) == (seconds // 3600, (seconds % 3600) // 60)
+
+def test_session_timing_uses_clock():
+    original = statusline.CLOCK
+    statusline.CLOCK = SimulatedClock(datetime(2026, 10, 19, 14, 30, tzinfo=timezone.utc))
+    try:
+        block_start = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+        assert statusline.format_time_remaining(block_start) == (2, 30, 9000)
+        assert statusline.calculate_session_percentage('2026-10-19T12:00:00Z', '2026-10-19T17:00:00Z') == 50
+        assert statusline.calculate_fixed_cycle_time_remaining(tz=timezone.utc)[:3] == (1, 30, 5400)
+    finally:
+        statusline.CLOCK = original
+
+def test_naive_session_times_use_local_tz():
+    tz = timezone(timedelta(hours=7))
+    now = datetime(2026, 10, 19, 13, 30, tzinfo=timezone.utc)  # 20:30 at UTC+7
+    original = statusline.LOCAL_TZ
+    statusline.LOCAL_TZ = tz
+    try:
+        assert statusline.format_time_remaining(datetime(2026, 10, 19, 18, 0), now) == (2, 30, 9000)
+        assert statusline.calculate_session_percentage('2026-10-19T18:00:00', '2026-10-19T23:00:00', now) == 50
+    finally:
+        statusline.LOCAL_TZ = original
+
+def test_ccusage_reset_time_shown_in_local_tz():
+    usage = {'start_time': '2026-10-19T11:00:00Z', 'reset_time': '2026-10-19T16:00:00Z',
+             'total_tokens': 0, 'cost_usd': 0, 'tokens_per_minute': 0, 'entries': 0}
+    original = (statusline.CLOCK, statusline.LOCAL_TZ, statusline.USE_FIXED_CYCLES,
+                statusline.get_git_info, statusline.get_usage_info_from_ccusage)
+    statusline.CLOCK = SimulatedClock(datetime(2026, 10, 19, 13, 30, tzinfo=timezone.utc))
+    statusline.LOCAL_TZ = timezone(timedelta(hours=7))
+    statusline.USE_FIXED_CYCLES = False
+    statusline.get_git_info = lambda cwd: (None, False)
+    statusline.get_usage_info_from_ccusage = lambda: usage
+    try:
+        output = run_main('')
+    finally:
+        (statusline.CLOCK, statusline.LOCAL_TZ, statusline.USE_FIXED_CYCLES,
+         statusline.get_git_info, statusline.get_usage_info_from_ccusage) = original
+    assert "⏱ 2h 30m until reset at 23:00 (50%)" in output, output
+
+if __name__ == "__main__":
+    # Fix encoding on Windows
+    if sys.platform == "win32":
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+    print("Replaying transcripts at simulated times:\n")
+    for name, test in sorted(globals().items()):
+        if name.startswith('test_') and callable(test):
+            try:
+                test()
+                print(f"✅ {name}")
+            except SkipTest as e:
+                print(f"⏭  {name}: skipped ({e})")
+            except AssertionError as e:
+                print(f"❌ {name}: {e}")